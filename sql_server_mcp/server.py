@@ -6,11 +6,17 @@ Provides tools for querying, schema inspection, and data manipulation.
 """
 
 import asyncio
-import json
+import base64
+import functools
 import logging
 import os
-from typing import Any, Dict, List, Optional, Sequence, Union
-from datetime import datetime, date
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from inspect import signature
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+from datetime import datetime
 import decimal
 
 import mcp.types as types
@@ -18,22 +24,607 @@ from mcp.server import Server
 from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 
+import orjson
 import pyodbc
-import pandas as pd
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import Float, Numeric, text, inspect
+from sqlalchemy.dialects import mssql
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncResult, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("sql-server-mcp")
 
+# Rows fetched per round trip when streaming results from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+# Seconds a reflected schema stays cached before it is read from the server again;
+# DDL run through execute_query invalidates it sooner
+SCHEMA_CACHE_TTL = 300.0
+
+# Seconds a successful check_connection() result is reused before probing again
+CONNECTION_INFO_TTL = 60.0
+
+# Tools without side effects; identical concurrent calls to these share one execution
+READ_ONLY_TOOLS = frozenset({
+    "get_schema",
+    "get_table_info",
+    "explain_query",
+    "check_connection",
+    "get_table_stats",
+    "search_tables",
+})
+
+# Fixed statements are built once so every call reuses the same TextClause
+# and SQLAlchemy's compiled-statement cache
+PING_QUERY = text("SELECT 1")
+
+SHOWPLAN_XML_ON = text("SET SHOWPLAN_XML ON")
+SHOWPLAN_XML_OFF = text("SET SHOWPLAN_XML OFF")
+
+# SERVERPROPERTY returns sql_variant, which pyodbc can't fetch, so it is cast
+CONNECTION_INFO_QUERY = text(
+    "SELECT @@VERSION AS version, "
+    "CAST(SERVERPROPERTY('ServerName') AS nvarchar(128)) AS server_name, "
+    "DB_NAME() AS database_name"
+)
+
+_TABLE_STATS_SELECT = """
+    SELECT 
+        t.name as table_name,
+        p.rows as row_count,
+        CAST(ROUND(((SUM(a.total_pages) * 8) / 1024.00), 2) AS NUMERIC(36, 2)) AS total_space_mb,
+        CAST(ROUND(((SUM(a.used_pages) * 8) / 1024.00), 2) AS NUMERIC(36, 2)) AS used_space_mb,
+        CAST(ROUND(((SUM(a.total_pages) - SUM(a.used_pages)) * 8) / 1024.00, 2) AS NUMERIC(36, 2)) AS unused_space_mb
+    FROM sys.tables t
+    INNER JOIN sys.indexes i ON t.object_id = i.object_id
+    INNER JOIN sys.partitions p ON i.object_id = p.object_id AND i.index_id = p.index_id
+    INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
+"""
+
+TABLE_STATS_QUERY = text(_TABLE_STATS_SELECT + """
+    WHERE t.name = :table_name
+    GROUP BY t.name, p.rows
+""")
+
+ALL_TABLE_STATS_QUERY = text(_TABLE_STATS_SELECT + """
+    GROUP BY t.name, p.rows
+    ORDER BY total_space_mb DESC
+""")
+
+SEARCH_TABLES_QUERY = text("""
+    SELECT table_name AS table_name, table_schema AS [schema]
+    FROM information_schema.tables
+    WHERE table_name LIKE :search_term
+""")
+
+SEARCH_COLUMNS_QUERY = text("""
+    SELECT table_name AS table_name, column_name AS column_name,
+           data_type AS data_type, is_nullable AS is_nullable
+    FROM information_schema.columns
+    WHERE column_name LIKE :search_term
+    ORDER BY table_name, column_name
+""")
+
+# Whole-database schema result sets, limited to the default schema like
+# Inspector.get_table_names() and joined client-side on object_id
+_SCHEMA_TABLES_SELECT = """
+    SELECT t.object_id, t.name
+    FROM sys.tables t
+    WHERE t.schema_id = SCHEMA_ID()
+    ORDER BY t.name
+"""
+
+# Same type columns the dialect's own reflection reads. TYPE_NAME() takes a
+# user_type_id; the system type is NULL for CLR types, which share id 240
+_SCHEMA_COLUMNS_SELECT = """
+    SELECT
+        c.object_id,
+        c.name,
+        TYPE_NAME(c.user_type_id),
+        TYPE_NAME(c.system_type_id),
+        c.max_length,
+        c.precision,
+        c.scale,
+        c.is_nullable
+    FROM sys.columns c
+    INNER JOIN sys.tables t ON t.object_id = c.object_id
+    WHERE t.schema_id = SCHEMA_ID()
+    ORDER BY c.object_id, c.column_id
+"""
+
+_SCHEMA_INDEXES_SELECT = """
+    SELECT
+        i.object_id,
+        i.name,
+        i.is_unique,
+        c.name
+    FROM sys.indexes i
+    INNER JOIN sys.tables t ON t.object_id = i.object_id
+    INNER JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE t.schema_id = SCHEMA_ID() AND i.is_primary_key = 0 AND i.type != 0
+        AND ic.is_included_column = 0
+    ORDER BY i.object_id, i.name, ic.key_ordinal
+"""
+
+# One batch per (include_columns, include_indexes) so get_schema() reads
+# everything it needs in a single round trip
+SCHEMA_BATCHES = {
+    (include_columns, include_indexes): ";".join(
+        [_SCHEMA_TABLES_SELECT]
+        + ([_SCHEMA_COLUMNS_SELECT] if include_columns else [])
+        + ([_SCHEMA_INDEXES_SELECT] if include_indexes else [])
+    )
+    for include_columns in (True, False)
+    for include_indexes in (True, False)
+}
+
+
+# SQL comments, skipped when classifying a statement batch
+COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+# Read-only queries that are streamed from a server-side cursor; anything else
+# runs through execute() so it can be committed and report its rowcount
+STREAMABLE_RE = re.compile(
+    r"\s*(SELECT|WITH)\b"
+    r"(?!.*\b(INTO|INSERT|UPDATE|DELETE|MERGE|EXEC|EXECUTE|CREATE|ALTER|DROP|TRUNCATE)\b)",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Statements anywhere in a batch that change the schema and so invalidate the
+# cached schema; a false positive only costs a fresh schema read
+DDL_RE = re.compile(
+    r"\b(CREATE|ALTER|DROP)\b|\bSELECT\b[^;]*?\bINTO\b|\bsp_rename\b",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Table and column names accepted by tools that splice identifiers into SQL
+IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,127}")
+
+_IDENTIFIER_PREPARER = mssql.dialect().identifier_preparer
+
+# Compiles :name parameters to the qmark style pyodbc cursors expect
+_QMARK_DIALECT = mssql.dialect(paramstyle="qmark")
+
+# Column types declared with a length, e.g. NVARCHAR(50) or VARBINARY(max)
+_LENGTH_TYPES = frozenset({"char", "varchar", "nchar", "nvarchar", "binary", "varbinary"})
+
+# sys.columns.max_length counts bytes; these store two per character
+_NATIONAL_TYPES = frozenset({"nchar", "nvarchar"})
+
+
+@dataclass(frozen=True)
+class DBConfig:
+    """SQL Server connection settings read from the environment"""
+    host: str
+    port: str
+    database: str
+    username: str
+    password: str
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionInfo:
+    """Result of check_connection(); orjson serializes it like a dict"""
+    connected: bool
+    server_name: str = ""
+    database_name: str = ""
+    server_version: str = ""
+    error: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1)
+def _load_cfg() -> DBConfig:
+    """Snapshot the SQL_SERVER_* environment variables once per process"""
+    return DBConfig(
+        host=os.getenv("SQL_SERVER_HOST", "192.168.1.117"),
+        port=os.getenv("SQL_SERVER_PORT", "1433"),
+        database=os.getenv("SQL_SERVER_DATABASE", "EM_Data"),
+        username=os.getenv("SQL_SERVER_USERNAME", "benhg"),
+        password=os.getenv("SQL_SERVER_PASSWORD", "")
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _quote_identifier(name: str) -> str:
+    """Validate a table/column name and return it bracket-quoted for T-SQL"""
+    if not IDENTIFIER_RE.fullmatch(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return _IDENTIFIER_PREPARER.quote_identifier(name)
+
+
+@functools.singledispatch
+def json_default(obj):
+    """orjson fallback for types it doesn't serialize natively (datetime, date
+    and UUID are handled by orjson itself and never reach this)"""
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+@json_default.register
+def _(obj: decimal.Decimal):
+    return float(obj)
+
+
+@json_default.register
+def _(obj: bytes):
+    return base64.b64encode(obj).decode()
+
+
+@json_default.register
+def _(obj: pyodbc.Row):
+    return list(obj)
+
+
+@functools.lru_cache(maxsize=128)
+def _is_streamable(query: str) -> bool:
+    """Whether a statement batch is a plain read that can use a server-side cursor"""
+    return bool(STREAMABLE_RE.match(COMMENT_RE.sub(" ", query)))
+
+
+@functools.lru_cache(maxsize=128)
+def _changes_schema(query: str) -> bool:
+    """Whether any statement in a batch may create, alter or drop tables"""
+    return bool(DDL_RE.search(COMMENT_RE.sub(" ", query)))
+
+
+def _shape_rows(rows: Sequence, format: str = "columnar") -> list:
+    """Copy Rows (columnar) or RowMappings (dict) into plain lists or dicts"""
+    if format == "dict":
+        return [dict(row) for row in rows]
+    return [list(row) for row in rows]
+
+
+def _tabulate(columns: list, rows: list, format: str = "columnar") -> Union[dict, list]:
+    """Wrap shaped rows for output; columnar results carry their column list once"""
+    if format == "dict":
+        return rows
+    return {"columns": columns, "rows": rows}
+
+
+def _plan_to_dict(element: ElementTree.Element) -> dict:
+    """Convert a showplan XML element into nested dicts, dropping namespaces"""
+    node: Dict[str, Any] = {"tag": element.tag.rpartition("}")[2]}
+    if element.attrib:
+        node["attributes"] = dict(element.attrib)
+    children = [_plan_to_dict(child) for child in element]
+    if children:
+        node["children"] = children
+    return node
+
+
+def _format_column_type(type_name: Optional[str], base_type: Optional[str], max_length: int, precision: int, scale: int) -> str:
+    """Render a sys.columns type the way reflection does, e.g. DECIMAL(10, 2)
+
+    Types reflection doesn't recognise, such as geography, keep their own name.
+    """
+    name = type_name if type_name in mssql.dialect.ischema_names else base_type
+    coltype = mssql.dialect.ischema_names.get(name)
+    if coltype is None:
+        return type_name.upper() if type_name else "NULL"
+    
+    kwargs = {}
+    if name in _LENGTH_TYPES:
+        if max_length != -1:
+            kwargs["length"] = max_length // 2 if name in _NATIONAL_TYPES else max_length
+        else:
+            kwargs["length"] = None
+    elif issubclass(coltype, (Numeric, Float)):
+        kwargs["precision"] = precision
+        if not issubclass(coltype, Float):
+            kwargs["scale"] = scale
+    return str(coltype(**kwargs))
+
+
+@functools.lru_cache(maxsize=128)
+def _compile(query: str) -> TextClause:
+    """Return a shared TextClause for query text that is run repeatedly"""
+    return text(query)
+
+
+@functools.lru_cache(maxsize=256)
+def _to_qmark(query: str) -> tuple:
+    """Rewrite :name parameters as ? and return (sql, parameter names in order)"""
+    compiled = _compile(query).compile(dialect=_QMARK_DIALECT)
+    return compiled.string, tuple(compiled.positiontup)
+
+
+def _fast_executemany(sync_conn, statement: str, rows: list) -> None:
+    """Send rows as one pyodbc parameter array instead of per-row round trips"""
+    cursor = sync_conn.connection.cursor()
+    try:
+        cursor.fast_executemany = True
+        cursor.executemany(statement, rows)
+    finally:
+        cursor.close()
+
+
+def _fetch_result_sets(sync_conn, statement: str) -> list:
+    """Run a multi-statement batch on a raw cursor and return every result set"""
+    cursor = sync_conn.connection.cursor()
+    try:
+        cursor.execute(statement)
+        result_sets = [cursor.fetchall()]
+        # The async driver adapter's nextset() always returns None, so the
+        # description (None once the sets run out) decides whether to go on
+        while True:
+            cursor.nextset()
+            if cursor.description is None:
+                break
+            result_sets.append(cursor.fetchall())
+        return result_sets
+    finally:
+        cursor.close()
+
+
+async def _collect_rows(result: AsyncResult, format: str = "columnar", limit: Optional[int] = None) -> tuple:
+    """Drain a streamed result one partition at a time, returning (columns, rows)
+
+    With a limit, reading stops once that many rows are collected and the
+    cursor is closed, leaving the remaining rows unfetched on the server.
+    """
+    columns = list(result.keys())
+    source = result.mappings() if format == "dict" else result
+    rows = []
+    async for partition in source.partitions():
+        if limit and len(rows) + len(partition) >= limit:
+            rows.extend(_shape_rows(partition[:limit - len(rows)], format))
+            await result.close()
+            break
+        rows.extend(_shape_rows(partition, format))
+    return columns, rows
+
+
+# Tool descriptors are static, so build them once at import time
+TOOLS: List[types.Tool] = [
+    types.Tool(
+        name="execute_query",
+        description="Execute a SQL query against the SQL Server database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "SQL query to execute"
+                },
+                "params": {
+                    "type": ["object", "array"],
+                    "description": "Parameters for parameterized queries, or an array of parameter objects to run the statement once per row in a single batch (no rows are returned, so limit and format are ignored)",
+                    "default": {}
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of rows to return; the query itself is not rewritten, so add TOP or OFFSET/FETCH to bound the work done on the server",
+                    "default": 1000
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Row format: 'columnar' (column list plus value arrays) or 'dict' (one object per row)",
+                    "enum": ["columnar", "dict"],
+                    "default": "columnar"
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    types.Tool(
+        name="get_schema",
+        description="Get database schema information including tables, columns, and relationships",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Specific table name (optional - if not provided, returns all tables)"
+                },
+                "include_columns": {
+                    "type": "boolean",
+                    "description": "Include column details",
+                    "default": True
+                },
+                "include_indexes": {
+                    "type": "boolean",
+                    "description": "Include index information",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="get_table_info",
+        description="Get detailed information about a specific table including schema, indexes, and sample data",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Name of the table to inspect"
+                },
+                "sample_rows": {
+                    "type": "integer",
+                    "description": "Number of sample rows to return",
+                    "default": 5
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Row format: 'columnar' (column list plus value arrays) or 'dict' (one object per row)",
+                    "enum": ["columnar", "dict"],
+                    "default": "columnar"
+                }
+            },
+            "required": ["table_name"]
+        }
+    ),
+    types.Tool(
+        name="explain_query",
+        description="Get the execution plan for a SQL query",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "SQL query to explain"
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Plan format: 'xml' (raw showplan document) or 'json' (parsed element tree)",
+                    "enum": ["xml", "json"],
+                    "default": "xml"
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    types.Tool(
+        name="check_connection",
+        description="Test database connection and return connection status",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Probe the server even if a recent result is cached",
+                    "default": False
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="get_table_stats",
+        description="Get statistics about table size, row count, and disk usage",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Table name (optional - if not provided, returns stats for all tables)"
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Row format: 'columnar' (column list plus value arrays) or 'dict' (one object per row)",
+                    "enum": ["columnar", "dict"],
+                    "default": "columnar"
+                }
+            },
+            "required": []
+        }
+    ),
+    types.Tool(
+        name="search_tables",
+        description="Search for tables and columns by name or pattern",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "search_term": {
+                    "type": "string",
+                    "description": "Search term or pattern"
+                },
+                "search_type": {
+                    "type": "string",
+                    "description": "Search type: 'table' or 'column' or 'both'",
+                    "enum": ["table", "column", "both"],
+                    "default": "both"
+                },
+                "format": {
+                    "type": "string",
+                    "description": "Row format: 'columnar' (column list plus value arrays) or 'dict' (one object per row)",
+                    "enum": ["columnar", "dict"],
+                    "default": "columnar"
+                }
+            },
+            "required": ["search_term"]
+        }
+    ),
+    types.Tool(
+        name="backup_table",
+        description="Create a backup copy of a table",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Source table name"
+                },
+                "backup_name": {
+                    "type": "string",
+                    "description": "Backup table name (optional - auto-generated if not provided)"
+                }
+            },
+            "required": ["table_name"]
+        }
+    ),
+    types.Tool(
+        name="insert_data",
+        description="Insert data into a table",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Target table name"
+                },
+                "data": {
+                    "type": "array",
+                    "description": "Array of objects representing rows to insert",
+                    "items": {
+                        "type": "object"
+                    }
+                },
+                "on_conflict": {
+                    "type": "string",
+                    "description": "How to handle existing rows: 'ignore' appends, 'replace' deletes them first",
+                    "enum": ["ignore", "replace"],
+                    "default": "ignore"
+                }
+            },
+            "required": ["table_name", "data"]
+        }
+    )
+]
+
+
 class SQLServerMCP:
     """SQL Server MCP Server implementation"""
     
     def __init__(self):
         self.server = Server("sql-server-mcp")
-        self.engine = None
+        self.engine: Optional[AsyncEngine] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._schema_cache: Dict[tuple, tuple] = {}
+        self._table_names_cache: Optional[tuple] = None
+        self._schema_generation = 0
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # (monotonic timestamp, ConnectionInfo) of the last successful connection check
+        self._conn_info: Optional[tuple] = None
+        # Set once connect() has built the engine; tool calls wait on it
+        self._ready = asyncio.Event()
+        # Serializes connect() so concurrent calls share one engine
+        self._connect_lock = asyncio.Lock()
+        self._tool_handlers = {
+            "execute_query": self.execute_query,
+            "get_schema": self.get_schema,
+            "get_table_info": self.get_table_info,
+            "explain_query": self.explain_query,
+            "check_connection": self.check_connection,
+            "get_table_stats": self.get_table_stats,
+            "search_tables": self.search_tables,
+            "backup_table": self.backup_table,
+            "insert_data": self.insert_data,
+        }
+        # Argument names each tool method accepts; clients may send extra fields
+        self._tool_params = {
+            name: frozenset(signature(handler).parameters)
+            for name, handler in self._tool_handlers.items()
+        }
         self.setup_tools()
+    
+    @property
+    def tools(self) -> List[types.Tool]:
+        """Tool descriptors advertised to clients, built once at import"""
+        return TOOLS
         
     def setup_tools(self):
         """Register all available tools"""
@@ -41,177 +632,7 @@ class SQLServerMCP:
         @self.server.list_tools()
         async def handle_list_tools() -> list[types.Tool]:
             """List available SQL Server tools"""
-            return [
-                types.Tool(
-                    name="execute_query",
-                    description="Execute a SQL query against the SQL Server database",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "SQL query to execute"
-                            },
-                            "params": {
-                                "type": "object",
-                                "description": "Parameters for parameterized queries",
-                                "default": {}
-                            },
-                            "limit": {
-                                "type": "integer",
-                                "description": "Maximum number of rows to return",
-                                "default": 1000
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                ),
-                types.Tool(
-                    name="get_schema",
-                    description="Get database schema information including tables, columns, and relationships",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {
-                                "type": "string",
-                                "description": "Specific table name (optional - if not provided, returns all tables)"
-                            },
-                            "include_columns": {
-                                "type": "boolean",
-                                "description": "Include column details",
-                                "default": True
-                            },
-                            "include_indexes": {
-                                "type": "boolean",
-                                "description": "Include index information",
-                                "default": False
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="get_table_info",
-                    description="Get detailed information about a specific table including schema, indexes, and sample data",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {
-                                "type": "string",
-                                "description": "Name of the table to inspect"
-                            },
-                            "sample_rows": {
-                                "type": "integer",
-                                "description": "Number of sample rows to return",
-                                "default": 5
-                            }
-                        },
-                        "required": ["table_name"]
-                    }
-                ),
-                types.Tool(
-                    name="explain_query",
-                    description="Get the execution plan for a SQL query",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "SQL query to explain"
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                ),
-                types.Tool(
-                    name="check_connection",
-                    description="Test database connection and return connection status",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="get_table_stats",
-                    description="Get statistics about table size, row count, and disk usage",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {
-                                "type": "string",
-                                "description": "Table name (optional - if not provided, returns stats for all tables)"
-                            }
-                        },
-                        "required": []
-                    }
-                ),
-                types.Tool(
-                    name="search_tables",
-                    description="Search for tables and columns by name or pattern",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "search_term": {
-                                "type": "string",
-                                "description": "Search term or pattern"
-                            },
-                            "search_type": {
-                                "type": "string",
-                                "description": "Search type: 'table' or 'column' or 'both'",
-                                "enum": ["table", "column", "both"],
-                                "default": "both"
-                            }
-                        },
-                        "required": ["search_term"]
-                    }
-                ),
-                types.Tool(
-                    name="backup_table",
-                    description="Create a backup copy of a table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {
-                                "type": "string",
-                                "description": "Source table name"
-                            },
-                            "backup_name": {
-                                "type": "string",
-                                "description": "Backup table name (optional - auto-generated if not provided)"
-                            }
-                        },
-                        "required": ["table_name"]
-                    }
-                ),
-                types.Tool(
-                    name="insert_data",
-                    description="Insert data into a table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "table_name": {
-                                "type": "string",
-                                "description": "Target table name"
-                            },
-                            "data": {
-                                "type": "array",
-                                "description": "Array of objects representing rows to insert",
-                                "items": {
-                                    "type": "object"
-                                }
-                            },
-                            "on_conflict": {
-                                "type": "string",
-                                "description": "How to handle conflicts: 'ignore' or 'replace'",
-                                "enum": ["ignore", "replace"],
-                                "default": "ignore"
-                            }
-                        },
-                        "required": ["table_name", "data"]
-                    }
-                )
-            ]
+            return self.tools
 
         @self.server.call_tool()
         async def handle_call_tool(
@@ -223,135 +644,159 @@ class SQLServerMCP:
                 arguments = {}
                 
             try:
-                if name == "execute_query":
-                    result = await self.execute_query(
-                        arguments["query"],
-                        arguments.get("params", {}),
-                        arguments.get("limit", 1000)
-                    )
-                elif name == "get_schema":
-                    result = await self.get_schema(
-                        arguments.get("table_name"),
-                        arguments.get("include_columns", True),
-                        arguments.get("include_indexes", False)
-                    )
-                elif name == "get_table_info":
-                    result = await self.get_table_info(
-                        arguments["table_name"],
-                        arguments.get("sample_rows", 5)
-                    )
-                elif name == "explain_query":
-                    result = await self.explain_query(arguments["query"])
-                elif name == "check_connection":
-                    result = await self.check_connection()
-                elif name == "get_table_stats":
-                    result = await self.get_table_stats(arguments.get("table_name"))
-                elif name == "search_tables":
-                    result = await self.search_tables(
-                        arguments["search_term"],
-                        arguments.get("search_type", "both")
-                    )
-                elif name == "backup_table":
-                    result = await self.backup_table(
-                        arguments["table_name"],
-                        arguments.get("backup_name")
-                    )
-                elif name == "insert_data":
-                    result = await self.insert_data(
-                        arguments["table_name"],
-                        arguments["data"],
-                        arguments.get("on_conflict", "ignore")
-                    )
+                if name in READ_ONLY_TOOLS:
+                    result = await self._single_flight(name, arguments)
                 else:
-                    raise ValueError(f"Unknown tool: {name}")
+                    result = await self._dispatch_tool(name, arguments)
                     
-                return [types.TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
+                payload = orjson.dumps(result, default=json_default, option=orjson.OPT_INDENT_2)
+                return [types.TextContent(type="text", text=payload.decode())]
                 
             except Exception as e:
-                logger.error(f"Error executing tool {name}: {str(e)}")
+                logger.error("Error executing tool %s: %s", name, e)
                 return [types.TextContent(type="text", text=f"Error: {str(e)}")]
 
-    async def connect(self):
-        """Initialize database connection"""
+    async def _dispatch_tool(self, name: str, arguments: dict) -> Any:
+        """Run the tool method matching name with the given arguments"""
+        handler = self._tool_handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        await self._ready.wait()
+        accepted = self._tool_params[name]
+        return await handler(**{key: value for key, value in arguments.items() if key in accepted})
+
+    async def _single_flight(self, name: str, arguments: dict) -> Any:
+        """Share one execution among identical read-only calls already in flight"""
         try:
-            # Get connection details from environment variables
-            server = os.getenv("SQL_SERVER_HOST", "192.168.1.117")
-            database = os.getenv("SQL_SERVER_DATABASE", "EM_Data")
-            username = os.getenv("SQL_SERVER_USERNAME", "benhg")
-            password = os.getenv("SQL_SERVER_PASSWORD", "")
-            port = os.getenv("SQL_SERVER_PORT", "1433")
+            key = (name, frozenset(arguments.items()))
+        except TypeError:
+            # Unhashable argument values; run the call on its own
+            return await self._dispatch_tool(name, arguments)
             
-            # Create connection string
-            connection_string = (
-                f"mssql+pyodbc://{username}@{server}:{port}/{database}"
-                "?driver=ODBC+Driver+17+for+SQL+Server"
-            )
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._dispatch_tool(name, arguments))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
             
-            self.engine = create_engine(
-                connection_string,
-                echo=False,
-                pool_pre_ping=True,
-                pool_recycle=3600
-            )
+        # Shield so one cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def connect(self):
+        """Initialize database connection; repeated calls reuse the engine"""
+        async with self._connect_lock:
+            if self._ready.is_set():
+                return
             
-            # Test connection
-            with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            try:
+                # Get connection details from environment variables
+                cfg = _load_cfg()
+                
+                # Create connection string
+                connection_string = (
+                    f"mssql+aioodbc://{cfg.username}@{cfg.host}:{cfg.port}/{cfg.database}"
+                    "?driver=ODBC+Driver+17+for+SQL+Server"
+                )
+                
+                # Size the pool from the environment; SQL_POOL_MAX caps total connections
+                pool_size = int(os.getenv("SQL_POOL_MIN", "5"))
+                pool_max = int(os.getenv("SQL_POOL_MAX", "20"))
+                # Recycle before common 30-minute idle timeouts on firewalls and load balancers
+                pool_recycle = int(os.getenv("SQL_POOL_RECYCLE", "1800"))
+                
+                self.engine = create_async_engine(
+                    connection_string,
+                    echo=False,
+                    poolclass=AsyncAdaptedQueuePool,
+                    pool_size=pool_size,
+                    max_overflow=max(pool_max - pool_size, 0),
+                    pool_timeout=30,
+                    pool_recycle=pool_recycle
+                )
+                
+                # Test connection
+                async with self.engine.connect() as conn:
+                    await conn.execute(PING_QUERY)
+                
+                # Keep idle connections warm instead of pre-pinging on every checkout
+                keepalive = float(os.getenv("SQL_POOL_KEEPALIVE", "60"))
+                if keepalive > 0:
+                    self._keepalive_task = asyncio.create_task(self._keepalive(keepalive))
+                
+                self._ready.set()
+                logger.info("Successfully connected to SQL Server")
                 
-            logger.info("Successfully connected to SQL Server")
+            except Exception as e:
+                logger.error("Failed to connect to SQL Server: %s", e)
+                raise
+
+    async def _keepalive(self, interval: float):
+        """Periodically ping a pooled connection so idle ones stay usable"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.engine.connect() as conn:
+                    await conn.execute(PING_QUERY)
+            except Exception as e:
+                logger.warning("Connection keepalive failed: %s", e)
+
+    async def close(self):
+        """Stop the keepalive task and release pooled connections"""
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
             
-        except Exception as e:
-            logger.error(f"Failed to connect to SQL Server: {str(e)}")
-            raise
-
-    def json_serializer(self, obj):
-        """JSON serializer for complex objects"""
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        elif isinstance(obj, decimal.Decimal):
-            return float(obj)
-        elif hasattr(obj, '__str__'):
-            return str(obj)
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-
-    async def execute_query(self, query: str, params: dict = None, limit: int = 1000) -> dict:
+        if self.engine:
+            await self.engine.dispose()
+        self._ready.clear()
+
+    async def execute_query(self, query: str, params: Union[dict, list] = None, limit: int = 1000, format: str = "columnar") -> dict:
         """Execute a SQL query and return results"""
-        if not self.engine:
-            await self.connect()
-            
+        if isinstance(params, list):
+            return await self.execute_many(query, params)
+        
         try:
-            with self.engine.connect() as conn:
-                # Add LIMIT equivalent for SQL Server if not present
-                if limit and "TOP" not in query.upper() and "OFFSET" not in query.upper():
-                    if query.strip().upper().startswith("SELECT"):
-                        query = query.replace("SELECT", f"SELECT TOP {limit}", 1)
-                
-                result = conn.execute(text(query), params or {})
-                
-                if result.returns_rows:
-                    rows = result.fetchall()
-                    columns = list(result.keys())
-                    
-                    # Convert to list of dictionaries
-                    data = []
-                    for row in rows:
-                        data.append(dict(zip(columns, row)))
-                    
-                    return {
-                        "success": True,
-                        "row_count": len(data),
-                        "columns": columns,
-                        "data": data,
-                        "query": query
-                    }
+            async with self.engine.connect() as conn:
+                # The statement text is sent unchanged so SQL Server can reuse its
+                # cached plan; the row limit is applied by reading at most `limit`
+                # rows from the cursor
+                if _is_streamable(query):
+                    # Build rows one server-side batch at a time
+                    result = await conn.stream(
+                        _compile(query),
+                        params or {},
+                        execution_options={"yield_per": min(limit, STREAM_BATCH_SIZE) if limit else STREAM_BATCH_SIZE}
+                    )
+                    columns, rows = await _collect_rows(result, format, limit)
                 else:
+                    result = await conn.execute(_compile(query), params or {})
+                    columns = rows = None
+                    if result.returns_rows:
+                        # e.g. procedures or DML with an OUTPUT clause
+                        columns = list(result.keys())
+                        source = result.mappings() if format == "dict" else result
+                        rows = _shape_rows(source.fetchmany(limit) if limit else source.fetchall(), format)
+                    rowcount = result.rowcount
+                    result.close()
+                    
                     # Commit the transaction for non-SELECT queries
-                    conn.commit()
+                    await conn.commit()
+                    if _changes_schema(query):
+                        self.invalidate_schema_cache()
+                
+                if rows is None:
                     return {
                         "success": True,
-                        "message": f"Query executed successfully. Rows affected: {result.rowcount}",
+                        "message": f"Query executed successfully. Rows affected: {rowcount}",
                         "query": query
                     }
+                return {
+                    "success": True,
+                    "row_count": len(rows),
+                    "columns": columns,
+                    "data" if format == "dict" else "rows": rows,
+                    "query": query
+                }
                     
         except Exception as e:
             return {
@@ -360,253 +805,333 @@ class SQLServerMCP:
                 "query": query
             }
 
+    async def stream_query(self, query: str, params: dict = None, format: str = "columnar", chunk_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list]:
+        """Yield result rows in chunks of at most chunk_size from a server-side cursor
+        
+        Only one chunk is held in memory at a time. To stop early without
+        reading the remaining rows, iterate inside contextlib.aclosing();
+        otherwise the connection and server-side cursor stay open until the
+        generator is garbage-collected.
+        """
+        async with self.engine.connect() as conn:
+            result = await conn.stream(
+                _compile(query), params or {}, execution_options={"yield_per": chunk_size}
+            )
+            source = result.mappings() if format == "dict" else result
+            async for partition in source.partitions():
+                yield _shape_rows(partition, format)
+
+    async def execute_many(self, query: str, rows: list) -> dict:
+        """Execute a statement once per parameter row as a single batch
+        
+        Rows are dicts for :name parameters or lists for ? placeholders.
+        """
+        try:
+            if rows and isinstance(rows[0], dict):
+                statement, names = _to_qmark(query)
+                # Fail like SQLAlchemy does rather than binding NULL for a missing key
+                for index, row in enumerate(rows):
+                    missing = [name for name in names if name not in row]
+                    if missing:
+                        raise ValueError(
+                            f"A value is required for bind parameter '{missing[0]}' in parameter row {index}"
+                        )
+                rows = [[row[name] for name in names] for row in rows]
+            else:
+                statement = query
+            
+            if rows:
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(_fast_executemany, statement, rows)
+                if _changes_schema(query):
+                    self.invalidate_schema_cache()
+            
+            return {
+                "success": True,
+                "message": f"Query executed successfully. Parameter rows: {len(rows)}",
+                "query": query
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "query": query
+            }
+
     async def get_schema(self, table_name: str = None, include_columns: bool = True, include_indexes: bool = False) -> dict:
         """Get database schema information"""
-        if not self.engine:
-            await self.connect()
+        key = (table_name, include_columns, include_indexes, self._schema_generation)
+        cached = self._schema_cache.get(key)
+        if cached and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+            return cached[1]
             
         try:
-            inspector = inspect(self.engine)
-            
-            if table_name:
-                # Get specific table info
-                if table_name not in inspector.get_table_names():
-                    return {"error": f"Table '{table_name}' not found"}
-                
-                table_info = {
-                    "table_name": table_name,
-                    "columns": [],
-                    "primary_keys": inspector.get_pk_constraint(table_name)["constrained_columns"],
-                    "foreign_keys": [
-                        {
-                            "columns": fk["constrained_columns"],
-                            "referred_table": fk["referred_table"],
-                            "referred_columns": fk["referred_columns"]
-                        }
-                        for fk in inspector.get_foreign_keys(table_name)
-                    ]
-                }
-                
-                if include_columns:
-                    for column in inspector.get_columns(table_name):
-                        table_info["columns"].append({
-                            "name": column["name"],
-                            "type": str(column["type"]),
-                            "nullable": column["nullable"],
-                            "default": column["default"]
-                        })
-                
-                if include_indexes:
-                    table_info["indexes"] = [
-                        {
-                            "name": idx["name"],
-                            "columns": idx["column_names"],
-                            "unique": idx["unique"]
-                        }
-                        for idx in inspector.get_indexes(table_name)
-                    ]
-                
-                return table_info
-            else:
-                # Get all tables
-                tables = []
-                for table in inspector.get_table_names():
-                    table_info = {"table_name": table}
-                    
-                    if include_columns:
-                        table_info["columns"] = [
-                            {
-                                "name": col["name"],
-                                "type": str(col["type"]),
-                                "nullable": col["nullable"]
-                            }
-                            for col in inspector.get_columns(table)
-                        ]
-                    
-                    tables.append(table_info)
+            async with self.engine.connect() as conn:
+                if table_name:
+                    schema = await conn.run_sync(
+                        self._reflect_schema, table_name, include_columns, include_indexes
+                    )
+                else:
+                    schema = await self._load_all_tables(conn, include_columns, include_indexes)
                 
-                return {
-                    "database": self.engine.url.database,
-                    "table_count": len(tables),
-                    "tables": tables
-                }
+            if "error" not in schema:
+                self._schema_cache[key] = (time.monotonic(), schema)
+            return schema
                 
         except Exception as e:
             return {"error": str(e)}
 
-    async def get_table_info(self, table_name: str, sample_rows: int = 5) -> dict:
-        """Get detailed table information with sample data"""
-        if not self.engine:
-            await self.connect()
+    def invalidate_schema_cache(self):
+        """Drop cached schema data after statements that may change it
+
+        Bumping the generation also keeps reflections started before the
+        change from repopulating the cache with stale results.
+        """
+        self._schema_generation += 1
+        self._schema_cache = {}
+        self._table_names_cache = None
+
+    def _get_table_names(self, inspector) -> list:
+        """Return table names, reusing the last listing while it is fresh"""
+        cached = self._table_names_cache
+        if cached and cached[1] == self._schema_generation and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+            return cached[2]
             
+        generation = self._schema_generation
+        table_names = inspector.get_table_names()
+        self._table_names_cache = (time.monotonic(), generation, table_names)
+        return table_names
+
+    def _reflect_schema(self, sync_conn, table_name: str, include_columns: bool = True, include_indexes: bool = False) -> dict:
+        """Reflect a single table's schema on a sync connection (run via run_sync)"""
+        inspector = inspect(sync_conn)
+        
+        if table_name not in self._get_table_names(inspector):
+            return {"error": f"Table '{table_name}' not found"}
+        
+        table_info = {
+            "table_name": table_name,
+            "columns": [],
+            "primary_keys": inspector.get_pk_constraint(table_name)["constrained_columns"],
+            "foreign_keys": [
+                {
+                    "columns": fk["constrained_columns"],
+                    "referred_table": fk["referred_table"],
+                    "referred_columns": fk["referred_columns"]
+                }
+                for fk in inspector.get_foreign_keys(table_name)
+            ]
+        }
+        
+        if include_columns:
+            for column in inspector.get_columns(table_name):
+                table_info["columns"].append({
+                    "name": column["name"],
+                    "type": str(column["type"]),
+                    "nullable": column["nullable"],
+                    "default": column["default"]
+                })
+        
+        if include_indexes:
+            table_info["indexes"] = [
+                {
+                    "name": idx["name"],
+                    "columns": idx["column_names"],
+                    "unique": idx["unique"]
+                }
+                for idx in inspector.get_indexes(table_name)
+            ]
+        
+        return table_info
+
+    async def _load_all_tables(self, conn, include_columns: bool = True, include_indexes: bool = False) -> dict:
+        """Load every table in the default schema with a single multi-result-set batch"""
+        result_sets = await conn.run_sync(
+            _fetch_result_sets, SCHEMA_BATCHES[(include_columns, include_indexes)]
+        )
+        expected = 1 + include_columns + include_indexes
+        if len(result_sets) != expected:
+            raise RuntimeError(
+                f"Schema batch returned {len(result_sets)} result sets, expected {expected}"
+            )
+        result_sets = iter(result_sets)
+        
+        tables = {}
+        for object_id, table_name in next(result_sets):
+            table_info = tables[object_id] = {"table_name": table_name}
+            if include_columns:
+                table_info["columns"] = []
+            if include_indexes:
+                table_info["indexes"] = []
+        
+        # The statements don't share a snapshot, so skip rows for tables
+        # created after the table list was read
+        if include_columns:
+            for object_id, column_name, *column_type, is_nullable in next(result_sets):
+                if object_id not in tables:
+                    continue
+                tables[object_id]["columns"].append({
+                    "name": column_name,
+                    "type": _format_column_type(*column_type),
+                    "nullable": bool(is_nullable)
+                })
+        
+        if include_indexes:
+            for object_id, index_name, is_unique, column_name in next(result_sets):
+                if object_id not in tables:
+                    continue
+                
+                # Rows arrive ordered by table, index and key position
+                indexes = tables[object_id]["indexes"]
+                if not indexes or indexes[-1]["name"] != index_name:
+                    indexes.append({"name": index_name, "columns": [], "unique": bool(is_unique)})
+                indexes[-1]["columns"].append(column_name)
+        
+        return {
+            "database": self.engine.url.database,
+            "table_count": len(tables),
+            "tables": list(tables.values())
+        }
+
+    async def get_table_info(self, table_name: str, sample_rows: int = 5, format: str = "columnar") -> dict:
+        """Get detailed table information with sample data"""
         try:
-            # Get schema info
-            schema_info = await self.get_schema(table_name, include_columns=True, include_indexes=True)
+            # Schema, row count and sample are independent; overlap their round trips
+            schema_info, row_count, sample = await asyncio.gather(
+                self.get_schema(table_name, include_columns=True, include_indexes=True),
+                self._count_rows(table_name),
+                self._sample_rows(table_name, sample_rows, format),
+                return_exceptions=True
+            )
             
             if "error" in schema_info:
                 return schema_info
+            for outcome in (row_count, sample):
+                if isinstance(outcome, BaseException):
+                    raise outcome
             
-            # Get row count
-            with self.engine.connect() as conn:
-                count_result = conn.execute(text(f"SELECT COUNT(*) as count FROM [{table_name}]"))
-                row_count = count_result.fetchone()[0]
-                
-                # Get sample data
-                sample_result = conn.execute(text(f"SELECT TOP {sample_rows} * FROM [{table_name}]"))
-                sample_data = []
-                columns = list(sample_result.keys())
-                
-                for row in sample_result.fetchall():
-                    sample_data.append(dict(zip(columns, row)))
-            
+            columns, sample_data = sample
             return {
                 **schema_info,
                 "row_count": row_count,
-                "sample_data": sample_data
+                "sample_data": _tabulate(columns, sample_data, format)
             }
             
         except Exception as e:
             return {"error": str(e)}
 
-    async def explain_query(self, query: str) -> dict:
+    async def _count_rows(self, table_name: str) -> int:
+        """Count a table's rows on a connection of its own"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_compile(f"SELECT COUNT_BIG(*) AS count FROM {_quote_identifier(table_name)}"))
+            return result.scalar_one()
+
+    async def _sample_rows(self, table_name: str, sample_rows: int, format: str = "columnar") -> tuple:
+        """Fetch the first sample_rows rows of a table, returning (columns, rows)"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                _compile(f"SELECT TOP (:sample_rows) * FROM {_quote_identifier(table_name)}"),
+                {"sample_rows": sample_rows}
+            )
+            columns = list(result.keys())
+            rows = result.mappings().all() if format == "dict" else result.fetchall()
+            return columns, _shape_rows(rows, format)
+
+    async def explain_query(self, query: str, format: str = "xml") -> dict:
         """Get execution plan for a query"""
-        if not self.engine:
-            await self.connect()
-            
         try:
-            with self.engine.connect() as conn:
-                # Get execution plan
-                conn.execute(text("SET SHOWPLAN_ALL ON"))
-                plan_result = conn.execute(text(query))
-                plan_data = plan_result.fetchall()
+            async with self.engine.connect() as conn:
+                # SHOWPLAN_XML returns the whole plan as a single XML document;
+                # always switch it off so the pooled session isn't left in plan mode
+                await conn.execute(SHOWPLAN_XML_ON)
+                try:
+                    plan_result = await conn.execute(_compile(query))
+                    plan_xml = plan_result.scalar()
+                finally:
+                    await conn.execute(SHOWPLAN_XML_OFF)
                 
-                conn.execute(text("SET SHOWPLAN_ALL OFF"))
-                
-                return {
-                    "query": query,
-                    "execution_plan": [dict(row._mapping) for row in plan_data]
-                }
+                if format == "json":
+                    return {
+                        "query": query,
+                        "plan": _plan_to_dict(ElementTree.fromstring(plan_xml))
+                    }
+                return {"query": query, "plan_xml": plan_xml}
                 
         except Exception as e:
             return {"error": str(e)}
 
-    async def check_connection(self) -> dict:
+    async def check_connection(self, refresh: bool = False) -> ConnectionInfo:
         """Test database connection"""
+        cached = self._conn_info
+        if not refresh and cached and time.monotonic() - cached[0] < CONNECTION_INFO_TTL:
+            return cached[1]
+        
         try:
-            if not self.engine:
-                await self.connect()
-            
-            with self.engine.connect() as conn:
-                result = conn.execute(text("SELECT @@VERSION as version, @@SERVERNAME as server_name, DB_NAME() as database_name"))
+            async with self.engine.connect() as conn:
+                result = await conn.execute(CONNECTION_INFO_QUERY)
                 info = result.fetchone()
                 
-                return {
-                    "connected": True,
-                    "server_version": info[0],
-                    "server_name": info[1],
-                    "database_name": info[2]
-                }
+                connection_info = ConnectionInfo(
+                    connected=True,
+                    server_version=info[0],
+                    server_name=info[1],
+                    database_name=info[2]
+                )
+                self._conn_info = (time.monotonic(), connection_info)
+                return connection_info
                 
         except Exception as e:
-            return {
-                "connected": False,
-                "error": str(e)
-            }
+            return ConnectionInfo(connected=False, error=str(e))
 
-    async def get_table_stats(self, table_name: str = None) -> dict:
+    async def get_table_stats(self, table_name: str = None, format: str = "columnar") -> dict:
         """Get table statistics"""
-        if not self.engine:
-            await self.connect()
-            
         try:
-            with self.engine.connect() as conn:
+            async with self.engine.connect() as conn:
                 if table_name:
-                    query = """
-                    SELECT 
-                        t.name as table_name,
-                        p.rows as row_count,
-                        CAST(ROUND(((SUM(a.total_pages) * 8) / 1024.00), 2) AS NUMERIC(36, 2)) AS total_space_mb,
-                        CAST(ROUND(((SUM(a.used_pages) * 8) / 1024.00), 2) AS NUMERIC(36, 2)) AS used_space_mb,
-                        CAST(ROUND(((SUM(a.total_pages) - SUM(a.used_pages)) * 8) / 1024.00, 2) AS NUMERIC(36, 2)) AS unused_space_mb
-                    FROM sys.tables t
-                    INNER JOIN sys.indexes i ON t.object_id = i.object_id
-                    INNER JOIN sys.partitions p ON i.object_id = p.object_id AND i.index_id = p.index_id
-                    INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
-                    WHERE t.name = :table_name
-                    GROUP BY t.name, p.rows
-                    """
-                    result = conn.execute(text(query), {"table_name": table_name})
+                    statement, params = TABLE_STATS_QUERY, {"table_name": table_name}
                 else:
-                    query = """
-                    SELECT 
-                        t.name as table_name,
-                        p.rows as row_count,
-                        CAST(ROUND(((SUM(a.total_pages) * 8) / 1024.00), 2) AS NUMERIC(36, 2)) AS total_space_mb,
-                        CAST(ROUND(((SUM(a.used_pages) * 8) / 1024.00), 2) AS NUMERIC(36, 2)) AS used_space_mb,
-                        CAST(ROUND(((SUM(a.total_pages) - SUM(a.used_pages)) * 8) / 1024.00, 2) AS NUMERIC(36, 2)) AS unused_space_mb
-                    FROM sys.tables t
-                    INNER JOIN sys.indexes i ON t.object_id = i.object_id
-                    INNER JOIN sys.partitions p ON i.object_id = p.object_id AND i.index_id = p.index_id
-                    INNER JOIN sys.allocation_units a ON p.partition_id = a.container_id
-                    GROUP BY t.name, p.rows
-                    ORDER BY total_space_mb DESC
-                    """
-                    result = conn.execute(text(query))
+                    statement, params = ALL_TABLE_STATS_QUERY, {}
                 
-                stats = []
-                columns = list(result.keys())
-                for row in result.fetchall():
-                    stats.append(dict(zip(columns, row)))
+                result = await conn.stream(
+                    statement, params, execution_options={"yield_per": STREAM_BATCH_SIZE}
+                )
+                
+                columns, stats = await _collect_rows(result, format)
                 
                 return {
                     "success": True,
-                    "statistics": stats
+                    "statistics": _tabulate(columns, stats, format)
                 }
                 
         except Exception as e:
             return {"error": str(e)}
 
-    async def search_tables(self, search_term: str, search_type: str = "both") -> dict:
+    async def search_tables(self, search_term: str, search_type: str = "both", format: str = "columnar") -> dict:
         """Search tables and columns by name"""
-        if not self.engine:
-            await self.connect()
-            
         try:
-            results = {"tables": [], "columns": []}
+            results = {"tables": _tabulate([], [], format), "columns": _tabulate([], [], format)}
             
-            with self.engine.connect() as conn:
+            async with self.engine.connect() as conn:
                 if search_type in ["table", "both"]:
                     # Search table names
-                    table_query = """
-                    SELECT table_name, table_schema
-                    FROM information_schema.tables
-                    WHERE table_name LIKE :search_term
-                    """
-                    table_result = conn.execute(text(table_query), {"search_term": f"%{search_term}%"})
+                    table_result = await conn.stream(
+                        SEARCH_TABLES_QUERY,
+                        {"search_term": f"%{search_term}%"},
+                        execution_options={"yield_per": STREAM_BATCH_SIZE}
+                    )
                     
-                    for row in table_result.fetchall():
-                        results["tables"].append({
-                            "table_name": row[0],
-                            "schema": row[1]
-                        })
+                    results["tables"] = _tabulate(*await _collect_rows(table_result, format), format)
                 
                 if search_type in ["column", "both"]:
                     # Search column names
-                    column_query = """
-                    SELECT table_name, column_name, data_type, is_nullable
-                    FROM information_schema.columns
-                    WHERE column_name LIKE :search_term
-                    ORDER BY table_name, column_name
-                    """
-                    column_result = conn.execute(text(column_query), {"search_term": f"%{search_term}%"})
+                    column_result = await conn.stream(
+                        SEARCH_COLUMNS_QUERY,
+                        {"search_term": f"%{search_term}%"},
+                        execution_options={"yield_per": STREAM_BATCH_SIZE}
+                    )
                     
-                    for row in column_result.fetchall():
-                        results["columns"].append({
-                            "table_name": row[0],
-                            "column_name": row[1],
-                            "data_type": row[2],
-                            "is_nullable": row[3]
-                        })
+                    results["columns"] = _tabulate(*await _collect_rows(column_result, format), format)
             
             return {
                 "success": True,
@@ -619,22 +1144,22 @@ class SQLServerMCP:
 
     async def backup_table(self, table_name: str, backup_name: str = None) -> dict:
         """Create a backup copy of a table"""
-        if not self.engine:
-            await self.connect()
-            
         try:
             if not backup_name:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_name = f"{table_name}_backup_{timestamp}"
             
-            with self.engine.connect() as conn:
+            source = _quote_identifier(table_name)
+            target = _quote_identifier(backup_name)
+            
+            async with self.engine.connect() as conn:
                 # Create backup table
-                query = f"SELECT * INTO [{backup_name}] FROM [{table_name}]"
-                conn.execute(text(query))
-                conn.commit()
+                await conn.execute(_compile(f"SELECT * INTO {target} FROM {source}"))
+                await conn.commit()
+                self.invalidate_schema_cache()
                 
                 # Get row count
-                count_result = conn.execute(text(f"SELECT COUNT(*) FROM [{backup_name}]"))
+                count_result = await conn.execute(_compile(f"SELECT COUNT(*) FROM {target}"))
                 row_count = count_result.fetchone()[0]
             
             return {
@@ -649,27 +1174,25 @@ class SQLServerMCP:
 
     async def insert_data(self, table_name: str, data: list, on_conflict: str = "ignore") -> dict:
         """Insert data into a table"""
-        if not self.engine:
-            await self.connect()
-            
         try:
             if not data:
                 return {"error": "No data provided"}
             
-            # Convert data to DataFrame for easier handling
-            df = pd.DataFrame(data)
-            
-            # Determine conflict handling
-            if_exists = "append" if on_conflict == "ignore" else "replace"
+            # Build one parameterized INSERT and bind all rows as a parameter array;
+            # columns are the union across rows so sparse rows insert NULLs
+            columns = list(dict.fromkeys(column for row in data for column in row))
+            column_list = ", ".join(_quote_identifier(column) for column in columns)
+            placeholders = ", ".join("?" * len(columns))
+            insert_sql = f"INSERT INTO {_quote_identifier(table_name)} ({column_list}) VALUES ({placeholders})"
+            rows = [[row.get(column) for column in columns] for row in data]
             
-            # Insert data
-            rows_affected = df.to_sql(
-                table_name,
-                self.engine,
-                if_exists=if_exists,
-                index=False,
-                method='multi'
-            )
+            async with self.engine.begin() as conn:
+                # 'replace' swaps out the existing rows, keeping the table definition
+                if on_conflict == "replace":
+                    await conn.execute(_compile(f"DELETE FROM {_quote_identifier(table_name)}"))
+                    
+                await conn.run_sync(_fast_executemany, insert_sql, rows)
+            self.invalidate_schema_cache()
             
             return {
                 "success": True,
@@ -683,25 +1206,33 @@ class SQLServerMCP:
 
 async def main():
     """Main entry point"""
+    # Configure logging here rather than at import so embedding the module
+    # doesn't change the host application's root logger
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO)
+    
     # Initialize MCP server
     mcp_server = SQLServerMCP()
     
-    # Connect to database
+    # Connect to database once; tool calls share the pool from here on
     await mcp_server.connect()
     
     # Run the server
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await mcp_server.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="sql-server-mcp",
-                server_version="1.0.0",
-                capabilities=types.ServerCapabilities(
-                    tools=types.ToolsCapability(listChanged=True)
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await mcp_server.server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="sql-server-mcp",
+                    server_version="1.0.0",
+                    capabilities=types.ServerCapabilities(
+                        tools=types.ToolsCapability(listChanged=True)
+                    )
                 )
             )
-        )
+    finally:
+        await mcp_server.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
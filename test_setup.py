@@ -5,100 +5,115 @@ Run this to verify your setup works correctly
 """
 
 import asyncio
-import os
 import sys
-from pathlib import Path
-
-# Add the project directory to path
-project_dir = Path(__file__).parent
-sys.path.insert(0, str(project_dir))
 
+# Resolved from the editable install (pip install -e .)
 from sql_server_mcp.server import SQLServerMCP
 
-async def test_connection():
+async def test_connection(mcp_server):
     """Test the MCP server connection"""
-    print("🔧 Testing SQL Server MCP Connection...")
-    print("-" * 50)
+    # Collect the report and write it once instead of flushing every line
+    out = []
+    try:
+        return await _check_connection(mcp_server, out)
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
+
+async def _check_connection(mcp_server, out):
+    """Run the connection checks, appending report lines to out"""
+    out.append("🔧 Testing SQL Server MCP Connection...")
+    out.append("-" * 50)
     
     try:
-        # Load environment variables
-        from dotenv import load_dotenv
-        load_dotenv()
+        # Load environment variables from .env when python-dotenv is installed
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            pass
+        else:
+            load_dotenv()
         
-        # Create MCP server instance
-        mcp_server = SQLServerMCP()
+        # Open the connection pool
+        await mcp_server.connect()
         
         # Test connection
-        print("1. Testing database connection...")
+        out.append("1. Testing database connection...")
         result = await mcp_server.check_connection()
         
-        if result.get("connected"):
-            print("✅ Database connection successful!")
-            print(f"   Server: {result.get('server_name')}")
-            print(f"   Database: {result.get('database_name')}")
-            print(f"   Version: {result.get('server_version', '')[:50]}...")
+        if result.connected:
+            out.append("✅ Database connection successful!")
+            out.append(f"   Server: {result.server_name}")
+            out.append(f"   Database: {result.database_name}")
+            out.append(f"   Version: {result.server_version[:50]}...")
         else:
-            print("❌ Database connection failed!")
-            print(f"   Error: {result.get('error')}")
+            out.append("❌ Database connection failed!")
+            out.append(f"   Error: {result.error}")
             return False
         
+        # Schema and query probes are independent; run them concurrently on the pool
+        schema_result, query_result = await asyncio.gather(
+            mcp_server.get_schema(),
+            mcp_server.execute_query("SELECT @@VERSION as version"),
+            return_exceptions=True
+        )
+        if isinstance(schema_result, Exception):
+            schema_result = {"error": str(schema_result)}
+        if isinstance(query_result, Exception):
+            query_result = {"success": False, "error": str(query_result)}
+        
         # Test schema retrieval
-        print("\n2. Testing schema retrieval...")
-        schema_result = await mcp_server.get_schema()
+        out.append("\n2. Testing schema retrieval...")
         
         if "error" not in schema_result:
             table_count = schema_result.get("table_count", 0)
-            print(f"✅ Schema retrieved successfully!")
-            print(f"   Found {table_count} tables")
+            out.append(f"✅ Schema retrieved successfully!")
+            out.append(f"   Found {table_count} tables")
             
             # Show first few table names
             tables = schema_result.get("tables", [])
             if tables:
-                print("   Sample tables:")
+                out.append("   Sample tables:")
                 for table in tables[:5]:
-                    print(f"     - {table.get('table_name')}")
+                    out.append(f"     - {table.get('table_name')}")
                 if len(tables) > 5:
-                    print(f"     ... and {len(tables) - 5} more")
+                    out.append(f"     ... and {len(tables) - 5} more")
         else:
-            print("❌ Schema retrieval failed!")
-            print(f"   Error: {schema_result.get('error')}")
+            out.append("❌ Schema retrieval failed!")
+            out.append(f"   Error: {schema_result.get('error')}")
         
         # Test simple query
-        print("\n3. Testing query execution...")
-        query_result = await mcp_server.execute_query("SELECT @@VERSION as version")
+        out.append("\n3. Testing query execution...")
         
         if query_result.get("success"):
-            print("✅ Query execution successful!")
-            print(f"   Returned {query_result.get('row_count')} rows")
+            out.append("✅ Query execution successful!")
+            out.append(f"   Returned {query_result.get('row_count')} rows")
         else:
-            print("❌ Query execution failed!")
-            print(f"   Error: {query_result.get('error')}")
+            out.append("❌ Query execution failed!")
+            out.append(f"   Error: {query_result.get('error')}")
         
-        print("\n" + "=" * 50)
-        print("🎉 MCP Server test completed successfully!")
-        print("Your SQL Server MCP is ready to use with Claude!")
+        out.append("\n" + "=" * 50)
+        out.append("🎉 MCP Server test completed successfully!")
+        out.append("Your SQL Server MCP is ready to use with Claude!")
         
         return True
         
     except Exception as e:
-        print(f"❌ Test failed with exception: {str(e)}")
-        print("\nCommon issues:")
-        print("1. Make sure SQL Server is running and accessible")
-        print("2. Verify your credentials in the .env file")
-        print("3. Check if ODBC Driver 17 is installed")
-        print("4. Ensure network connectivity to the SQL Server")
+        out.append(f"❌ Test failed with exception: {str(e)}")
+        out.append("\nCommon issues:")
+        out.append("1. Make sure SQL Server is running and accessible")
+        out.append("2. Verify your credentials in the .env file")
+        out.append("3. Check if ODBC Driver 17 is installed")
+        out.append("4. Ensure network connectivity to the SQL Server")
         return False
 
-async def test_tools():
+async def test_tools(mcp_server):
     """Test available MCP tools"""
     print("\n🔧 Testing MCP Tools...")
     print("-" * 30)
     
     try:
-        mcp_server = SQLServerMCP()
-        
         # Test tools list (this doesn't require DB connection)
-        tools = await mcp_server.server._handler.list_tools()
+        tools = mcp_server.tools
         
         print(f"✅ Found {len(tools)} available tools:")
         for i, tool in enumerate(tools, 1):
@@ -110,15 +125,24 @@ async def test_tools():
         print(f"❌ Tools test failed: {str(e)}")
         return False
 
+async def _main():
+    """Run both checks on a single event loop and server instance"""
+    mcp_server = SQLServerMCP()
+    try:
+        # Test tools first (no DB required)
+        await test_tools(mcp_server)
+        
+        # Test database connection
+        return await test_connection(mcp_server)
+    finally:
+        # Stop the keepalive task and dispose of the pool
+        await mcp_server.close()
+
 if __name__ == "__main__":
     print("🚀 SQL Server MCP Test Suite")
     print("=" * 50)
     
-    # Test tools first (no DB required)
-    asyncio.run(test_tools())
-    
-    # Test database connection
-    success = asyncio.run(test_connection())
+    success = asyncio.run(_main())
     
     if success:
         print("\n📝 Next Steps:")
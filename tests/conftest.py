@@ -0,0 +1,13 @@
+"""
+Shared pytest configuration for SQL Server MCP tests
+"""
+
+# Run async tests on uvloop when it is installed (it has no Windows support)
+try:
+    import uvloop
+except ImportError:
+    pass
+else:
+    def pytest_asyncio_loop_factories(config, item):
+        """Event loop factories picked up by pytest-asyncio"""
+        return {"uvloop": uvloop.new_event_loop}
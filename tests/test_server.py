@@ -3,71 +3,193 @@ Tests for SQL Server MCP Server
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
-import os
-from unittest.mock import Mock, AsyncMock, patch
-from sqlalchemy import create_engine, text
-import pandas as pd
+import contextlib
+import decimal
+import orjson
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncResult
 
 # Import the MCP server class
-import sys
-sys.path.append('..')
-from sql_server_mcp.server import SQLServerMCP
+from sql_server_mcp.server import SQLServerMCP, _load_cfg, json_default
+
+TEST_ENV = {
+    'SQL_SERVER_HOST': 'localhost',
+    'SQL_SERVER_DATABASE': 'test_db',
+    'SQL_SERVER_USERNAME': 'test_user',
+    'SQL_SERVER_PASSWORD': 'test_pass',
+    'SQL_SERVER_PORT': '1433'
+}
+
+
+async def _partitions(*partitions):
+    """Async iterator standing in for AsyncResult.partitions()"""
+    for partition in partitions:
+        yield partition
+
+
+def _sync_conn(cursor):
+    """Plain stand-in for the sync Connection run_sync passes to helpers"""
+    return SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cursor))
+
+
+class _ResultSetCursor:
+    """DBAPI cursor over fixed result sets that behaves like SQLAlchemy's async
+    adapter cursor: nextset() returns None and description marks the end"""
+
+    def __init__(self, *result_sets):
+        self.result_sets = result_sets
+        self.position = 0
+        self.executed = []
+        self.closed = False
+
+    def execute(self, statement):
+        self.executed.append(statement)
+
+    @property
+    def description(self):
+        return [("column",)] if self.position < len(self.result_sets) else None
+
+    def fetchall(self):
+        return self.result_sets[self.position]
+
+    def nextset(self):
+        self.position += 1
+
+    def close(self):
+        self.closed = True
+
+
+# The engine -> connection -> result mock graph is built once at import;
+# spec= makes async methods AsyncMocks and rejects misspelled attributes
+_ENGINE = MagicMock(spec=AsyncEngine)
+_CONNECTION = MagicMock(spec=AsyncConnection)
+_RESULT = MagicMock(spec=CursorResult)
+_STREAM_RESULT = MagicMock(spec=AsyncResult)
+# stream() is wrapped by a decorator, so spec can't tell it is a coroutine
+_CONNECTION.stream = AsyncMock()
+
+
+def _wire_engine():
+    """Reset the shared mocks and point them at a single 'test_value' row"""
+    for mock in (_ENGINE, _CONNECTION, _RESULT, _STREAM_RESULT):
+        mock.reset_mock(return_value=True, side_effect=True)
+    
+    # Mock async connection context manager
+    _ENGINE.connect.return_value.__aenter__.return_value = _CONNECTION
+    
+    # Mock query execution
+    _CONNECTION.execute.return_value = _RESULT
+    _RESULT.fetchall.return_value = [('test_value',)]
+    _RESULT.fetchmany.return_value = [('test_value',)]
+    _RESULT.keys.return_value = ['test_column']
+    _RESULT.returns_rows = True
+    _RESULT.rowcount = 1
+    
+    # Mock streamed (server-side cursor) execution
+    _CONNECTION.stream.return_value = _STREAM_RESULT
+    _STREAM_RESULT.keys.return_value = ['test_column']
+    _STREAM_RESULT.partitions = lambda size=None: _partitions([('test_value',)])
+    _STREAM_RESULT.mappings.return_value.partitions = lambda size=None: _partitions(
+        [{'test_column': 'test_value'}]
+    )
+    return _ENGINE
 
 
 class TestSQLServerMCP:
     """Test cases for SQL Server MCP"""
     
+    @pytest.fixture(scope="session", autouse=True)
+    def sql_server_env(self):
+        """Point connection settings at a fake server for the whole session"""
+        with pytest.MonkeyPatch.context() as mp:
+            for key, value in TEST_ENV.items():
+                mp.setenv(key, value)
+            # connect() snapshots these once; drop any snapshot taken before
+            _load_cfg.cache_clear()
+            yield
+        _load_cfg.cache_clear()
+    
+    # Async tests share the session loop so the shared server's asyncio
+    # primitives stay bound to the loop the tests run on
+    @pytest_asyncio.fixture(scope="session", loop_scope="session")
+    async def shared_server(self):
+        """Single MCP server instance reused by every test"""
+        server = SQLServerMCP()
+        yield server
+        await server.close()
+    
     @pytest.fixture
-    def mcp_server(self):
-        """Create MCP server instance for testing"""
-        return SQLServerMCP()
+    def mcp_server(self, shared_server):
+        """Shared MCP server with per-test state cleared"""
+        shared_server.engine = None
+        shared_server.invalidate_schema_cache()
+        shared_server._inflight.clear()
+        shared_server._conn_info = None
+        shared_server._ready.clear()
+        yield shared_server
+        shared_server.engine = None
     
     @pytest.fixture
     def mock_engine(self):
-        """Mock SQLAlchemy engine"""
-        engine = Mock()
-        connection = Mock()
-        result = Mock()
+        """Mock SQLAlchemy engine, reset and rewired for each test"""
+        return _wire_engine()
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_connect_success(self, mcp_server):
+        """Test successful database connection"""
+        with patch('sql_server_mcp.server.create_async_engine') as mock_create_engine:
+            mock_engine = MagicMock()
+            mock_create_engine.return_value = mock_engine
+            
+            # Mock successful connection test
+            mock_connection = MagicMock()
+            mock_connection.execute = AsyncMock()
+            mock_engine.connect.return_value.__aenter__.return_value = mock_connection
+            mock_engine.dispose = AsyncMock()
+            
+            await mcp_server.connect()
+            
+            assert mcp_server.engine is not None
+            mock_create_engine.assert_called_once()
+            assert "localhost:1433/test_db" in mock_create_engine.call_args.args[0]
+            assert mcp_server._ready.is_set()
+            
+            await mcp_server.close()
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_connect_once(self, mcp_server, monkeypatch):
+        """Test repeated and concurrent connect() calls build a single engine"""
+        monkeypatch.setenv("SQL_POOL_KEEPALIVE", "0")
         
-        # Mock connection context manager
-        engine.connect.return_value.__enter__.return_value = connection
-        engine.connect.return_value.__exit__.return_value = None
+        with patch('sql_server_mcp.server.create_async_engine', return_value=_wire_engine()) as mock_create_engine:
+            await asyncio.gather(mcp_server.connect(), mcp_server.connect())
+            await mcp_server.connect()
         
-        # Mock query execution
-        connection.execute.return_value = result
-        result.fetchall.return_value = [('test_value',)]
-        result.keys.return_value = ['test_column']
-        result.returns_rows = True
-        result.rowcount = 1
+        mock_create_engine.assert_called_once()
+        assert mcp_server._ready.is_set()
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_connect_pool_settings(self, mcp_server, monkeypatch):
+        """Test the shared pool is sized and recycled from the environment"""
+        monkeypatch.setenv("SQL_POOL_MIN", "5")
+        monkeypatch.setenv("SQL_POOL_MAX", "15")
+        monkeypatch.setenv("SQL_POOL_KEEPALIVE", "0")
+        monkeypatch.delenv("SQL_POOL_RECYCLE", raising=False)
         
-        return engine
+        with patch('sql_server_mcp.server.create_async_engine', return_value=_wire_engine()) as mock_create_engine:
+            await mcp_server.connect()
+        
+        kwargs = mock_create_engine.call_args.kwargs
+        assert kwargs["pool_size"] == 5
+        assert kwargs["max_overflow"] == 10
+        assert kwargs["pool_recycle"] == 1800
+        assert mcp_server._keepalive_task is None
     
-    @pytest.mark.asyncio
-    async def test_connect_success(self, mcp_server):
-        """Test successful database connection"""
-        with patch.dict(os.environ, {
-            'SQL_SERVER_HOST': 'localhost',
-            'SQL_SERVER_DATABASE': 'test_db',
-            'SQL_SERVER_USERNAME': 'test_user',
-            'SQL_SERVER_PASSWORD': 'test_pass',
-            'SQL_SERVER_PORT': '1433'
-        }):
-            with patch('sql_server_mcp.server.create_engine') as mock_create_engine:
-                mock_engine = Mock()
-                mock_create_engine.return_value = mock_engine
-                
-                # Mock successful connection test
-                mock_connection = Mock()
-                mock_engine.connect.return_value.__enter__.return_value = mock_connection
-                mock_engine.connect.return_value.__exit__.return_value = None
-                
-                await mcp_server.connect()
-                
-                assert mcp_server.engine is not None
-                mock_create_engine.assert_called_once()
-    
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_execute_query_select(self, mcp_server, mock_engine):
         """Test executing SELECT query"""
         mcp_server.engine = mock_engine
@@ -76,26 +198,468 @@ class TestSQLServerMCP:
         result = await mcp_server.execute_query(query)
         
         assert result["success"] is True
-        assert "data" in result
-        assert "columns" in result
+        assert result["columns"] == ["test_column"]
+        assert result["rows"] == [["test_value"]]
         assert result["row_count"] == 1
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_query_dict_format(self, mcp_server, mock_engine):
+        """Test executing SELECT query with per-row dict output"""
+        mcp_server.engine = mock_engine
+        
+        result = await mcp_server.execute_query("SELECT * FROM test_table", format="dict")
+        
+        assert result["success"] is True
+        assert result["data"] == [{"test_column": "test_value"}]
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_query_limit(self, mcp_server, mock_engine):
+        """Test the row limit stops reading without rewriting the SQL"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        stream_result = connection.stream.return_value
+        stream_result.partitions = lambda size=None: _partitions([(1,), (2,)], [(3,), (4,)], [(5,), (6,)])
+        
+        query = "SELECT * FROM test_table"
+        result = await mcp_server.execute_query(query, limit=3)
+        
+        assert result["rows"] == [[1], [2], [3]]
+        assert result["query"] == query
+        assert connection.stream.call_args.args[0].text == query
+        stream_result.close.assert_awaited_once()
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_query_dml_not_streamed(self, mcp_server, mock_engine):
+        """Test statements that may write run through execute() and are committed"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        _RESULT.returns_rows = False
+        _RESULT.rowcount = 3
+        
+        result = await mcp_server.execute_query("-- tidy up\nDELETE FROM test_table WHERE a > 1")
+        
+        assert result["message"] == "Query executed successfully. Rows affected: 3"
+        connection.stream.assert_not_awaited()
+        connection.commit.assert_awaited_once()
+        
+        _RESULT.returns_rows = True
+        result = await mcp_server.execute_query(
+            "UPDATE test_table SET a = 2 OUTPUT inserted.a", limit=1
+        )
+        
+        assert result["rows"] == [["test_value"]]
+        _RESULT.fetchmany.assert_called_once_with(1)
+        connection.stream.assert_not_awaited()
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stream_query_chunks(self, mcp_server, mock_engine):
+        """Test streamed queries deliver one server-side batch per chunk"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        stream_result = connection.stream.return_value
+        stream_result.partitions = lambda size=None: _partitions([(1,), (2,)], [(3,), (4,)], [(5,)])
+        stream_result.mappings.return_value.partitions = lambda size=None: _partitions(
+            [{"a": 1}, {"a": 2}], [{"a": 3}]
+        )
+        
+        chunks = [chunk async for chunk in mcp_server.stream_query("SELECT a FROM t", chunk_size=2)]
+        
+        assert len(chunks) == 3
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert chunks == [[[1], [2]], [[3], [4]], [[5]]]
+        assert connection.stream.call_args.kwargs["execution_options"] == {"yield_per": 2}
+        
+        chunks = [chunk async for chunk in mcp_server.stream_query("SELECT a FROM t", format="dict", chunk_size=2)]
+        
+        assert chunks == [[{"a": 1}, {"a": 2}], [{"a": 3}]]
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_stream_query_early_exit(self, mcp_server, mock_engine):
+        """Test closing the generator after one chunk releases the connection"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value
+        connection.__aenter__.return_value.stream.return_value.partitions = lambda size=None: _partitions(
+            [(1,), (2,)], [(3,), (4,)]
+        )
+        
+        async with contextlib.aclosing(mcp_server.stream_query("SELECT a FROM t", chunk_size=2)) as chunks:
+            async for chunk in chunks:
+                break
+            
+        assert chunk == [[1], [2]]
+        connection.__aexit__.assert_awaited_once()
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_query_overlaps(self, mcp_server, mock_engine):
+        """Test concurrent queries are in flight together rather than serialized"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        stream_result = connection.stream.return_value
+        in_flight = []
+        both_started = asyncio.Event()
+        
+        async def stream(*args, **kwargs):
+            in_flight.append(args[0].text)
+            if len(in_flight) == 2:
+                both_started.set()
+            # Each call waits for the other, so a blocking driver would deadlock
+            await both_started.wait()
+            return stream_result
+        
+        connection.stream.side_effect = stream
+        
+        results = await asyncio.wait_for(asyncio.gather(
+            mcp_server.execute_query("SELECT 1"),
+            mcp_server.execute_query("SELECT 2")
+        ), timeout=1)
+        
+        assert sorted(in_flight) == ["SELECT 1", "SELECT 2"]
+        assert all(result["success"] for result in results)
+    
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_check_connection_success(self, mcp_server, mock_engine):
         """Test successful connection check"""
         mcp_server.engine = mock_engine
         
         # Mock version query result
-        mock_result = Mock()
-        mock_result.fetchone.return_value = ('Microsoft SQL Server 2019', 'SERVER01', 'TestDB')
-        mock_engine.connect.return_value.__enter__.return_value.execute.return_value = mock_result
+        mock_result = SimpleNamespace(fetchone=lambda: ('Microsoft SQL Server 2019', 'SERVER01', 'TestDB'))
+        mock_engine.connect.return_value.__aenter__.return_value.execute.return_value = mock_result
         
         result = await mcp_server.check_connection()
         
-        assert result["connected"] is True
-        assert "server_version" in result
-        assert "server_name" in result
-        assert "database_name" in result
+        assert result.connected is True
+        assert result.server_version == 'Microsoft SQL Server 2019'
+        assert result.server_name == 'SERVER01'
+        assert result.database_name == 'TestDB'
+        assert orjson.loads(orjson.dumps(result)) == {
+            "connected": True,
+            "server_name": "SERVER01",
+            "database_name": "TestDB",
+            "server_version": "Microsoft SQL Server 2019",
+            "error": None
+        }
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_check_connection_cached(self, mcp_server, mock_engine):
+        """Test the connection probe is reused until a refresh is requested"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        connection.execute.return_value.fetchone.return_value = ('Microsoft SQL Server 2019', 'SERVER01', 'TestDB')
+        
+        first = await mcp_server.check_connection()
+        second = await mcp_server.check_connection()
+        
+        assert first == second
+        assert connection.execute.await_count == 1
+        
+        await mcp_server.check_connection(refresh=True)
+        
+        assert connection.execute.await_count == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_explain_query_resets_showplan(self, mcp_server, mock_engine):
+        """Test SHOWPLAN_XML is switched off even when the query fails"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        plan_result = SimpleNamespace(scalar=lambda: (
+            '<ShowPlanXML xmlns="http://schemas.microsoft.com/sqlserver/2004/07/showplan">'
+            '<BatchSequence/></ShowPlanXML>'
+        ))
+        connection.execute.side_effect = [None, plan_result, None]
+        
+        result = await mcp_server.explain_query("SELECT 1", format="json")
+        
+        assert result["plan"] == {"tag": "ShowPlanXML", "children": [{"tag": "BatchSequence"}]}
+        
+        connection.execute.side_effect = [None, Exception("bad query"), None]
+        
+        result = await mcp_server.explain_query("SELEC 1")
+        
+        assert result == {"error": "bad query"}
+        assert str(connection.execute.call_args_list[-1].args[0]) == "SET SHOWPLAN_XML OFF"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_schema_cached(self, mcp_server, mock_engine):
+        """Test schema reflection is reused until the cache is invalidated"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        connection.run_sync.return_value = {"table_name": "test_table", "columns": []}
+
+        first = await mcp_server.get_schema("test_table")
+        second = await mcp_server.get_schema("test_table")
+
+        assert first == second
+        assert connection.run_sync.await_count == 1
+
+        mcp_server.invalidate_schema_cache()
+        await mcp_server.get_schema("test_table")
+
+        assert connection.run_sync.await_count == 2
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_schema_invalidated_by_ddl(self, mcp_server, mock_engine):
+        """Test cache hits skip the database and DDL forces a fresh read"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        connection.run_sync.return_value = {"table_name": "test_table", "columns": []}
+        _RESULT.returns_rows = False
+
+        await mcp_server.get_schema("test_table")
+        await mcp_server.execute_query("UPDATE test_table SET a = 1")
+        connect_count = mock_engine.connect.call_count
+        await mcp_server.get_schema("test_table")
+
+        assert mock_engine.connect.call_count == connect_count
+
+        await mcp_server.execute_query("  alter TABLE test_table ADD b INT")
+        await mcp_server.get_schema("test_table")
+
+        assert connection.run_sync.await_count == 2
+
+        for statement in (
+            "/* setup */ SET XACT_ABORT ON; CREATE TABLE t2 (a INT)",
+            "USE test_db\nDROP TABLE t2",
+            "SELECT a INTO t3 FROM test_table"
+        ):
+            await mcp_server.execute_query(statement)
+            await mcp_server.get_schema("test_table")
+
+        assert connection.run_sync.await_count == 5
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_schema_reflects_off_loop(self, mcp_server, mock_engine):
+        """Test single-table reflection is dispatched through run_sync"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        connection.run_sync.return_value = {"table_name": "test_table", "columns": []}
+
+        await mcp_server.get_schema("test_table", include_indexes=True)
+
+        connection.run_sync.assert_awaited_once_with(
+            mcp_server._reflect_schema, "test_table", True, True
+        )
+
+    def test_reflect_schema(self, mcp_server):
+        """Test the sync reflection helper builds a plain dict from the inspector"""
+        inspector = SimpleNamespace(
+            get_table_names=lambda: ["test_table"],
+            get_pk_constraint=lambda table: {"constrained_columns": ["id"]},
+            get_foreign_keys=lambda table: [],
+            get_columns=lambda table: [
+                {"name": "id", "type": "INTEGER", "nullable": False, "default": None}
+            ],
+            get_indexes=lambda table: [
+                {"name": "ix_id", "column_names": ["id"], "unique": True}
+            ]
+        )
+
+        with patch('sql_server_mcp.server.inspect', return_value=inspector):
+            result = mcp_server._reflect_schema(SimpleNamespace(), "test_table", True, True)
+            missing = mcp_server._reflect_schema(SimpleNamespace(), "nope")
+
+        assert result == {
+            "table_name": "test_table",
+            "columns": [{"name": "id", "type": "INTEGER", "nullable": False, "default": None}],
+            "primary_keys": ["id"],
+            "foreign_keys": [],
+            "indexes": [{"name": "ix_id", "columns": ["id"], "unique": True}]
+        }
+        assert missing == {"error": "Table 'nope' not found"}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_schema_all_tables(self, mcp_server, mock_engine):
+        """Test all-table schema is assembled from one multi-result-set batch"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        cursor = _ResultSetCursor(
+            [(1, "a"), (2, "b")],
+            [
+                (1, "id", "int", "int", 4, 10, 0, False),
+                (1, "name", "nvarchar", "nvarchar", 100, 0, 0, True),
+                (1, "owner", "sysname", "nvarchar", 256, 0, 0, False),
+                (1, "price", "decimal", "decimal", 9, 10, 2, True),
+                (1, "ratio", "float", "float", 8, 53, 0, True),
+                (1, "doc", "xml", "xml", -1, 0, 0, True),
+                (1, "shape", "geography", None, -1, 0, 0, True),
+                (1, "ghost", None, None, 8, 0, 0, True)
+            ],
+            [(1, "ix_name", True, "name")]
+        )
+        sync_conn = _sync_conn(cursor)
+        connection.run_sync.side_effect = lambda fn, *args: fn(sync_conn, *args)
+
+        result = await mcp_server.get_schema(include_indexes=True)
+
+        assert connection.run_sync.await_count == 1
+        assert len(cursor.executed) == 1
+        assert result["table_count"] == 2
+        assert result["tables"][0] == {
+            "table_name": "a",
+            "columns": [
+                {"name": "id", "type": "INTEGER", "nullable": False},
+                {"name": "name", "type": "NVARCHAR(50)", "nullable": True},
+                {"name": "owner", "type": "NVARCHAR(128)", "nullable": False},
+                {"name": "price", "type": "DECIMAL(10, 2)", "nullable": True},
+                {"name": "ratio", "type": "FLOAT", "nullable": True},
+                {"name": "doc", "type": "XML", "nullable": True},
+                {"name": "shape", "type": "GEOGRAPHY", "nullable": True},
+                {"name": "ghost", "type": "NULL", "nullable": True}
+            ],
+            "indexes": [{"name": "ix_name", "columns": ["name"], "unique": True}]
+        }
+        assert result["tables"][1] == {"table_name": "b", "columns": [], "indexes": []}
+        assert cursor.closed
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_table_info(self, mcp_server, mock_engine):
+        """Test table info combines schema, row count and sample data"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        connection.run_sync.return_value = {"table_name": "test_table", "columns": []}
+        connection.execute.return_value.scalar_one.return_value = 1
+
+        result = await mcp_server.get_table_info("test_table")
+
+        assert result["table_name"] == "test_table"
+        assert result["row_count"] == 1
+        assert result["sample_data"] == {"columns": ["test_column"], "rows": [["test_value"]]}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_get_table_info_missing_table(self, mcp_server, mock_engine):
+        """Test a missing table reports the schema error, not a query failure"""
+        mcp_server.engine = mock_engine
+        connection = mock_engine.connect.return_value.__aenter__.return_value
+        connection.run_sync.return_value = {"error": "Table 'nope' not found"}
+        connection.execute.side_effect = Exception("Invalid object name 'nope'")
+
+        result = await mcp_server.get_table_info("nope")
+
+        assert result == {"error": "Table 'nope' not found"}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_many_batch(self, mcp_server, mock_engine):
+        """Test a list of parameter sets is sent as one executemany batch"""
+        mcp_server.engine = mock_engine
+        cursor = Mock()
+        sync_conn = _sync_conn(cursor)
+        connection = MagicMock()
+        connection.run_sync = AsyncMock(side_effect=lambda fn, *args: fn(sync_conn, *args))
+        mock_engine.begin.return_value.__aenter__.return_value = connection
+
+        result = await mcp_server.execute_query(
+            "UPDATE test_table SET b = :b WHERE a = :a",
+            params=[{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]
+        )
+
+        assert result["success"] is True
+        assert cursor.fast_executemany is True
+        cursor.executemany.assert_called_once_with(
+            "UPDATE test_table SET b = ? WHERE a = ?", [["x", 1], ["y", 2]]
+        )
+        mock_engine.connect.assert_not_called()
+
+        mcp_server._schema_cache[("cached",)] = (0.0, {})
+        await mcp_server.execute_query("SELECT :a AS a INTO test_copy", params=[{"a": 1}])
+
+        assert mcp_server._schema_cache == {}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_execute_many_missing_parameter(self, mcp_server, mock_engine):
+        """Test a parameter row without every :name is rejected before anything runs"""
+        mcp_server.engine = mock_engine
+
+        result = await mcp_server.execute_query(
+            "UPDATE test_table SET b = :b WHERE a = :a",
+            params=[{"a": 1, "b": "x"}, {"a": 2, "bb": "y"}]
+        )
+
+        assert result["success"] is False
+        assert result["error"] == "A value is required for bind parameter 'b' in parameter row 1"
+        mock_engine.begin.assert_not_called()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_insert_data_fast_executemany(self, mcp_server, mock_engine):
+        """Test rows are bound as one parameter array on a raw cursor"""
+        mcp_server.engine = mock_engine
+        cursor = Mock()
+        sync_conn = _sync_conn(cursor)
+        connection = MagicMock()
+        connection.run_sync = AsyncMock(side_effect=lambda fn, *args: fn(sync_conn, *args))
+        mock_engine.begin.return_value.__aenter__.return_value = connection
+
+        result = await mcp_server.insert_data("test_table", [{"a": 1, "b": "x"}, {"a": 2}, {"c": True}])
+
+        assert result["success"] is True
+        assert cursor.fast_executemany is True
+        cursor.executemany.assert_called_once_with(
+            "INSERT INTO [test_table] ([a], [b], [c]) VALUES (?, ?, ?)",
+            [[1, "x", None], [2, None, None], [None, None, True]]
+        )
+        cursor.close.assert_called_once()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_backup_table_rejects_bad_identifier(self, mcp_server, mock_engine):
+        """Test table names that aren't plain identifiers never reach the server"""
+        mcp_server.engine = mock_engine
+
+        result = await mcp_server.backup_table("users]; DROP TABLE users; --")
+
+        assert "Invalid identifier" in result["error"]
+        mock_engine.connect.assert_not_called()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_single_flight_shares_identical_calls(self, mcp_server):
+        """Test identical concurrent read-only calls run the tool once"""
+        async def slow_schema(name, arguments):
+            await asyncio.sleep(0.01)
+            return {"tables": []}
+
+        with patch.object(mcp_server, "_dispatch_tool", AsyncMock(side_effect=slow_schema)) as dispatch:
+            results = await asyncio.gather(
+                mcp_server._single_flight("get_schema", {"include_columns": True}),
+                mcp_server._single_flight("get_schema", {"include_columns": True}),
+                mcp_server._single_flight("get_schema", {"include_columns": False})
+            )
+
+        assert results == [{"tables": []}] * 3
+        assert dispatch.await_count == 2
+        assert mcp_server._inflight == {}
+
+    def test_tools_match_handlers(self, mcp_server):
+        """Test the advertised tool list is shared and every tool has a handler"""
+        assert mcp_server.tools is SQLServerMCP().tools
+        assert {tool.name for tool in mcp_server.tools} == set(mcp_server._tool_handlers)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_dispatch_tool(self, mcp_server):
+        """Test tool names map to methods, extra arguments are dropped and
+        unknown names are rejected"""
+        stats = AsyncMock(return_value={"success": True})
+        with patch.dict(mcp_server._tool_handlers, {"get_table_stats": stats}):
+            pending = asyncio.ensure_future(
+                mcp_server._dispatch_tool("get_table_stats", {"table_name": "test_table", "client_hint": 1})
+            )
+            await asyncio.sleep(0)
+            # Calls wait for connect() to mark the server ready
+            assert not pending.done()
+            stats.assert_not_awaited()
+
+            mcp_server._ready.set()
+            result = await pending
+
+        assert result == {"success": True}
+        stats.assert_awaited_once_with(table_name="test_table")
+
+        with pytest.raises(ValueError):
+            await mcp_server._dispatch_tool("drop_database", {})
+
+    def test_json_default(self):
+        """Test fallback serialization of types orjson doesn't handle"""
+        assert json_default(decimal.Decimal("1.5")) == 1.5
+        assert json_default(b"\x00\x01") == "AAE="
+
+        with pytest.raises(TypeError):
+            json_default(object())
 
 
 # Run tests